@@ -48,6 +48,9 @@ def start_main_bot():
         logging.info("🤖 Starting main bot...")
         
         # Import and run main bot
+        from config import print_config_summary
+        print_config_summary()
+
         from bot import main
         main()
         
@@ -55,15 +58,16 @@ def start_main_bot():
         logging.error(f"Bot error: {e}")
         app_status['bot_status'] = 'error'
 
+# Start the bot thread at import time so it also runs under gunicorn
+# (which imports app:app instead of executing this file)
+bot_thread = threading.Thread(target=start_main_bot)
+bot_thread.daemon = True
+bot_thread.start()
+
+app_status['bot_status'] = 'running'
+
 if __name__ == '__main__':
-    # Start bot in background thread
-    bot_thread = threading.Thread(target=start_main_bot)
-    bot_thread.daemon = True
-    bot_thread.start()
-    
-    app_status['bot_status'] = 'running'
-    
-    # Start Flask app
+    # Fallback for running directly without gunicorn
     port = int(os.environ.get('PORT', 8080))
     logging.info(f"🌐 Flask app starting on port {port}")
     
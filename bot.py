@@ -1,15 +1,40 @@
-import websocket
-import json
+import asyncio
+import websockets
+import msgspec
+try:
+    import orjson
+    _json_loads = orjson.loads
+    def _json_dumps(obj):
+        return orjson.dumps(obj).decode()
+except ImportError:
+    # Fallback so a minimal install still runs, just slower
+    import json
+    orjson = None
+    _json_loads = json.loads
+    _json_dumps = json.dumps
 import telebot
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from pybloom_live import ScalableBloomFilter
+import sys
 import threading
 import time
 import logging
 import os
+import queue
 import schedule
+from functools import lru_cache
 from datetime import datetime
+from typing import List, Optional
 from flask import Flask, jsonify
-from config import *
+from flask.json.provider import JSONProvider
+from config import (
+    TELEGRAM_TOKEN, CHAT_ID, MONITORED_ADDRESSES, MONITORED_SET,
+    MINIMUM_USD_VALUE, IGNORE_DUST_TRANSACTIONS, LOG_LEVEL,
+    HEALTH_CHECK_INTERVAL, PRICE_UPDATE_INTERVAL, MAX_ADDRESSES_PER_MESSAGE,
+    RAILWAY_PUBLIC_DOMAIN, get_address_label
+)
 
 # Setup logging
 logging.basicConfig(
@@ -20,13 +45,30 @@ logging.basicConfig(
 # Initialize Flask app first
 app = Flask(__name__)
 
+class ORJSONProvider(JSONProvider):
+    """Serialize Flask responses with orjson instead of stdlib json"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+if orjson is not None:
+    app.json = ORJSONProvider(app)
+
 # Initialize bot
 bot = telebot.TeleBot(TELEGRAM_TOKEN)
 
 # Global variables
 crypto_prices = {'btc': 0, 'eth': 0}
-processed_transactions = set()
-filtered_transactions = set()
+# Satoshi equivalent of MINIMUM_USD_VALUE, refreshed with each price update;
+# sentinel keeps everything filtered until the first price arrives
+BTC_MIN_SATOSHI = 2**63
+# Rebuild the dedup filter once it has absorbed this many hashes, so its
+# memory is bounded by capacity rather than daily feed volume
+TX_DEDUP_CAPACITY = 500_000
+processed_transactions = ScalableBloomFilter(initial_capacity=100_000, error_rate=1e-4)
 start_time = time.time()
 address_stats = {
     'btc': {addr: {'alerts': 0, 'total_value': 0, 'filtered_count': 0} for addr in MONITORED_ADDRESSES['btc']},
@@ -42,18 +84,151 @@ health_status = {
     'errors_count': 0
 }
 
+# Running aggregates maintained on the alert/filter paths under stats_lock
+# so HTTP endpoints read O(1) counters instead of rescanning every address
+stats_lock = threading.Lock()
+running_totals = {
+    'btc': {'alerts': 0, 'filtered': 0, 'value': 0.0},
+    'eth': {'alerts': 0, 'filtered': 0, 'value': 0.0}
+}
+
+# Alerts are queued here and drained by a dedicated sender thread so the
+# WebSocket handler never blocks on the Telegram API
+alert_queue = queue.Queue(maxsize=10_000)
+
+# Per-thread stat shards: each feed thread bumps its own buffer behind an
+# uncontended per-shard lock, and the scheduler folds the buffers into the
+# global counters once a second. Entries are [alerts, filtered, value].
+_stat_shards = []
+_shard_registry_lock = threading.Lock()
+_thread_shard = threading.local()
+
+def _get_stat_shard():
+    shard = getattr(_thread_shard, 'shard', None)
+    if shard is None:
+        shard = {'lock': threading.Lock(), 'btc': {}, 'eth': {}}
+        _thread_shard.shard = shard
+        with _shard_registry_lock:
+            _stat_shards.append(shard)
+    return shard
+
+def _bump_shard(shard, crypto_type, addr, alerts=0, filtered=0, value=0.0):
+    with shard['lock']:
+        pending = shard[crypto_type]
+        entry = pending.get(addr)
+        if entry is None:
+            entry = pending[addr] = [0, 0, 0.0]
+        entry[0] += alerts
+        entry[1] += filtered
+        entry[2] += value
+        if not alerts:
+            return entry[0]
+        # Combined alert total (folded + pending) read while still holding
+        # the shard lock, so a concurrent flush cannot move these pending
+        # increments into the folded counter between the bump and the read
+        # and get them counted twice
+        with stats_lock:
+            return entry[0] + address_stats[crypto_type][addr]['alerts']
+
+def flush_stat_shards():
+    """รวมสถิติจาก thread-local shards เข้ากับตัวนับ global"""
+    with _shard_registry_lock:
+        shards = list(_stat_shards)
+
+    for shard in shards:
+        with shard['lock']:
+            pending_btc = shard['btc']
+            pending_eth = shard['eth']
+            shard['btc'] = {}
+            shard['eth'] = {}
+
+        with stats_lock:
+            for crypto_type, pending in (('btc', pending_btc), ('eth', pending_eth)):
+                if not pending:
+                    continue
+                stats_map = address_stats[crypto_type]
+                totals = running_totals[crypto_type]
+                for addr, (alerts, filtered, value) in pending.items():
+                    stats = stats_map[addr]
+                    stats['alerts'] += alerts
+                    stats['filtered_count'] += filtered
+                    stats['total_value'] += value
+                    totals['alerts'] += alerts
+                    totals['filtered'] += filtered
+                    totals['value'] += value
+                    health_status['total_alerts'] += alerts
+                    health_status['total_filtered'] += filtered
+
+# Labels resolved once at startup so endpoints do plain dict lookups
+ADDRESS_LABEL_CACHE = {
+    'btc': {addr: get_address_label(addr, 'btc') for addr in MONITORED_ADDRESSES['btc']},
+    'eth': {addr: get_address_label(addr, 'eth') for addr in MONITORED_ADDRESSES['eth']}
+}
+
+# Short display forms are constant per watchlist address — slice them once
+SHORT_BTC = {addr: f"{addr[:15]}...{addr[-8:]}" for addr in MONITORED_ADDRESSES['btc']}
+
+# Typed views of the Blockchain.info frames: msgspec decodes straight into
+# C-level structs, skipping the nested dict/list allocations per frame
+class PrevOut(msgspec.Struct):
+    addr: Optional[str] = None
+    value: int = 0
+
+class TxInput(msgspec.Struct):
+    prev_out: Optional[PrevOut] = None
+
+class TxOutput(msgspec.Struct):
+    addr: Optional[str] = None
+    value: int = 0
+
+class Tx(msgspec.Struct):
+    hash: str = ''
+    inputs: List[TxInput] = []
+    out: List[TxOutput] = []
+
+class Frame(msgspec.Struct):
+    op: str = ''
+    x: Optional[Tx] = None
+
+_frame_decoder = msgspec.json.Decoder(Frame)
+
+# Raw-payload prefilter: watched addresses appear verbatim in the JSON, so
+# a C-level substring scan can reject a frame without decoding it at all
+_BTC_ADDR_SUBSTRINGS = tuple(MONITORED_ADDRESSES['btc'])
+
+# Alert template bound once at import; format_btc_message only fills fields
+_BTC_ALERT_TEMPLATE = """
+🔔 <b>BTC Incoming Transaction</b>
+
+📥 <b>To:</b> {label}
+💰 <b>Amount:</b> {value_btc:.8f} BTC
+💵 <b>USD Value:</b> ${usd_value:,.2f}
+
+📤 <b>From:</b> <code>{from_addr}...</code>
+📍 <b>Address:</b> <code>{short_addr}</code>
+
+🔗 <b>Hash:</b> <code>{short_hash}...</code>
+⏰ <b>Time:</b> {alert_time}
+📊 <b>Alert #:</b> {alert_count}
+📈 <b>Type:</b> Incoming Transfer
+
+<a href="https://blockchain.info/tx/{tx_hash}">View Transaction</a>
+""".format
+
 # Flask health endpoints
 @app.route('/health')
 def health_check():
     uptime = time.time() - start_time
     
-    # Calculate total alerts and values
-    total_btc_alerts = sum(stats['alerts'] for stats in address_stats['btc'].values())
-    total_eth_alerts = sum(stats['alerts'] for stats in address_stats['eth'].values())
-    total_btc_value = sum(stats['total_value'] for stats in address_stats['btc'].values())
-    total_eth_value = sum(stats['total_value'] for stats in address_stats['eth'].values())
-    total_btc_filtered = sum(stats['filtered_count'] for stats in address_stats['btc'].values())
-    total_eth_filtered = sum(stats['filtered_count'] for stats in address_stats['eth'].values())
+    # Read the running totals instead of rescanning every address
+    btc_totals = running_totals['btc']
+    eth_totals = running_totals['eth']
+    total_btc_alerts = btc_totals['alerts']
+    total_eth_alerts = eth_totals['alerts']
+    total_btc_value = btc_totals['value']
+    total_eth_value = eth_totals['value']
+    total_btc_filtered = btc_totals['filtered']
+    total_eth_filtered = eth_totals['filtered']
     
     return jsonify({
         'status': health_status['status'],
@@ -93,26 +268,31 @@ def health_check():
 @app.route('/addresses')
 def list_addresses():
     """List all monitored addresses with labels"""
-    btc_list = []
-    for addr in MONITORED_ADDRESSES['btc']:
-        btc_list.append({
-            'address': addr,
-            'label': get_address_label(addr, 'btc'),
-            'alerts': address_stats['btc'][addr]['alerts'],
-            'filtered_count': address_stats['btc'][addr]['filtered_count'],
-            'total_value_usd': address_stats['btc'][addr]['total_value']
-        })
-    
-    eth_list = []
-    for addr in MONITORED_ADDRESSES['eth']:
-        eth_list.append({
-            'address': addr,
-            'label': get_address_label(addr, 'eth'),
-            'alerts': address_stats['eth'][addr]['alerts'],
-            'filtered_count': address_stats['eth'][addr]['filtered_count'],
-            'total_value_usd': address_stats['eth'][addr]['total_value']
-        })
-    
+    labels_btc = ADDRESS_LABEL_CACHE['btc']
+    labels_eth = ADDRESS_LABEL_CACHE['eth']
+
+    # Snapshot stats under the lock so the flush job can't mutate mid-read
+    with stats_lock:
+        btc_list = [
+            {
+                'address': addr,
+                'label': labels_btc[addr],
+                'alerts': s['alerts'],
+                'filtered_count': s['filtered_count'],
+                'total_value_usd': s['total_value']
+            } for addr, s in address_stats['btc'].items()
+        ]
+
+        eth_list = [
+            {
+                'address': addr,
+                'label': labels_eth[addr],
+                'alerts': s['alerts'],
+                'filtered_count': s['filtered_count'],
+                'total_value_usd': s['total_value']
+            } for addr, s in address_stats['eth'].items()
+        ]
+
     return jsonify({
         'btc_addresses': btc_list,
         'eth_addresses': eth_list,
@@ -126,12 +306,19 @@ def list_addresses():
         }
     })
 
+@lru_cache(maxsize=2)
+def _top_addresses(time_bucket):
+    """Top-5 addresses by value, cached for the 5-second bucket"""
+    with stats_lock:
+        top_btc = sorted(address_stats['btc'].items(), key=lambda x: x[1]['total_value'], reverse=True)[:5]
+        top_eth = sorted(address_stats['eth'].items(), key=lambda x: x[1]['total_value'], reverse=True)[:5]
+    return top_btc, top_eth
+
 @app.route('/stats')
 def get_stats():
     """Get detailed statistics"""
     # Top performing addresses
-    top_btc = sorted(address_stats['btc'].items(), key=lambda x: x[1]['total_value'], reverse=True)[:5]
-    top_eth = sorted(address_stats['eth'].items(), key=lambda x: x[1]['total_value'], reverse=True)[:5]
+    top_btc, top_eth = _top_addresses(int(time.time() // 5))
     
     return jsonify({
         'top_btc_addresses': [
@@ -184,17 +371,29 @@ def index():
         }
     })
 
+# Keep-alive session for price polling (one TLS handshake per process,
+# not one per poll); retries with backoff cover transient CoinGecko
+# errors and rate limiting without waiting for the next poll interval
+_price_retry = Retry(total=3, backoff_factor=0.3,
+                     status_forcelist=[429, 500, 502, 503, 504])
+_price_session = requests.Session()
+_price_session.mount('https://', HTTPAdapter(pool_connections=2, pool_maxsize=4,
+                                             max_retries=_price_retry))
+_price_session.headers['Accept'] = 'application/json'
+
 def get_crypto_prices():
     """ดึงราคาเหรียญ"""
-    global crypto_prices, health_status
+    global crypto_prices, health_status, BTC_MIN_SATOSHI
     try:
         url = "https://api.coingecko.com/api/v3/simple/price"
         params = {'ids': 'bitcoin,ethereum', 'vs_currencies': 'usd'}
-        response = requests.get(url, params=params, timeout=10)
-        data = response.json()
+        response = _price_session.get(url, params=params, timeout=10)
+        data = _json_loads(response.content)
         
         crypto_prices['btc'] = data.get('bitcoin', {}).get('usd', 0)
         crypto_prices['eth'] = data.get('ethereum', {}).get('usd', 0)
+        btc_price = crypto_prices['btc']
+        BTC_MIN_SATOSHI = int(MINIMUM_USD_VALUE / btc_price * 100000000) if btc_price else 2**63
         health_status['last_price_update'] = datetime.now().isoformat()
         
         logging.info(f"Updated prices - BTC: ${crypto_prices['btc']:,.2f}, ETH: ${crypto_prices['eth']:,.2f}")
@@ -204,21 +403,23 @@ def get_crypto_prices():
 
 def send_startup_summary():
     """ส่งสรุปการตั้งค่าเมื่อเริ่มต้น"""
-    btc_count = len(MONITORED_ADDRESSES['btc'])
-    eth_count = len(MONITORED_ADDRESSES['eth'])
+    # Hoist the repeated dict lookups once per call
+    btc_addrs = MONITORED_ADDRESSES['btc']
+    eth_addrs = MONITORED_ADDRESSES['eth']
+    btc_count = len(btc_addrs)
+    eth_count = len(eth_addrs)
     
     # Create address list with labels
-    btc_list = []
-    for addr in MONITORED_ADDRESSES['btc'][:MAX_ADDRESSES_PER_MESSAGE]:
-        label = get_address_label(addr, 'btc')
-        btc_list.append(f"• <code>{label}</code>")
+    btc_labels = ADDRESS_LABEL_CACHE['btc']
+    btc_list = [f"• <code>{btc_labels[addr]}</code>"
+                for addr in btc_addrs[:MAX_ADDRESSES_PER_MESSAGE]]
     
-    eth_list = []
-    for addr in MONITORED_ADDRESSES['eth'][:MAX_ADDRESSES_PER_MESSAGE]:
-        label = get_address_label(addr, 'eth')
-        eth_list.append(f"• <code>{label}</code>")
+    eth_labels = ADDRESS_LABEL_CACHE['eth']
+    eth_list = [f"• <code>{eth_labels[addr]}</code>"
+                for addr in eth_addrs[:MAX_ADDRESSES_PER_MESSAGE]]
     
-    message = f"""
+    # Build the message in parts and join once (avoids O(n^2) str concat)
+    parts = [f"""
 🚀 <b>Enhanced Crypto Monitor Started</b>
 🌐 <b>Platform:</b> Railway.app
 
@@ -231,23 +432,23 @@ def send_startup_summary():
 💰 Minimum: ${MINIMUM_USD_VALUE} USD
 🗑️ Dust Filter: {'Enabled' if IGNORE_DUST_TRANSACTIONS else 'Disabled'}
 
-"""
-    
+"""]
+
     if btc_list:
-        message += f"₿ <b>BTC Addresses:</b>\n"
-        message += "\n".join(btc_list)
+        parts.append("₿ <b>BTC Addresses:</b>\n")
+        parts.append("\n".join(btc_list))
         if btc_count > MAX_ADDRESSES_PER_MESSAGE:
-            message += f"\n<i>... and {btc_count - MAX_ADDRESSES_PER_MESSAGE} more</i>"
-        message += "\n\n"
-    
+            parts.append(f"\n<i>... and {btc_count - MAX_ADDRESSES_PER_MESSAGE} more</i>")
+        parts.append("\n\n")
+
     if eth_list:
-        message += f"⟠ <b>ETH Addresses:</b>\n"
-        message += "\n".join(eth_list)
+        parts.append("⟠ <b>ETH Addresses:</b>\n")
+        parts.append("\n".join(eth_list))
         if eth_count > MAX_ADDRESSES_PER_MESSAGE:
-            message += f"\n<i>... and {eth_count - MAX_ADDRESSES_PER_MESSAGE} more</i>"
-        message += "\n\n"
-    
-    message += f"""
+            parts.append(f"\n<i>... and {eth_count - MAX_ADDRESSES_PER_MESSAGE} more</i>")
+        parts.append("\n\n")
+
+    parts.append(f"""
 🔌 <b>WebSocket:</b> Connecting...
 💰 <b>Current Prices:</b>
 ₿ BTC: ${crypto_prices['btc']:,.2f}
@@ -260,10 +461,12 @@ def send_startup_summary():
 
 ⚡ <b>Status:</b> All systems started!
 📥 <b>Ready to monitor incoming transfers ≥ ${MINIMUM_USD_VALUE} USD!</b>
-"""
-    
+""")
+
+    message = "".join(parts)
+
     try:
-        bot.send_message(CHAT_ID, message, parse_mode='HTML')
+        telegram_sender.send(message)
         logging.info("Startup summary sent successfully")
     except Exception as e:
         logging.error(f"Error sending startup summary: {e}")
@@ -271,20 +474,25 @@ def send_startup_summary():
 def send_daily_report():
     """ส่งรายงานประจำวัน"""
     uptime_hours = (time.time() - start_time) / 3600
+    btc_count = len(MONITORED_ADDRESSES['btc'])
+    eth_count = len(MONITORED_ADDRESSES['eth'])
     
-    # Calculate totals
-    total_btc_alerts = sum(stats['alerts'] for stats in address_stats['btc'].values())
-    total_eth_alerts = sum(stats['alerts'] for stats in address_stats['eth'].values())
-    total_btc_value = sum(stats['total_value'] for stats in address_stats['btc'].values())
-    total_eth_value = sum(stats['total_value'] for stats in address_stats['eth'].values())
-    total_btc_filtered = sum(stats['filtered_count'] for stats in address_stats['btc'].values())
-    total_eth_filtered = sum(stats['filtered_count'] for stats in address_stats['eth'].values())
+    # Read the running totals instead of rescanning every address
+    btc_totals = running_totals['btc']
+    eth_totals = running_totals['eth']
+    total_btc_alerts = btc_totals['alerts']
+    total_eth_alerts = eth_totals['alerts']
+    total_btc_value = btc_totals['value']
+    total_eth_value = eth_totals['value']
+    total_btc_filtered = btc_totals['filtered']
+    total_eth_filtered = eth_totals['filtered']
     
     # Find most active addresses
-    top_btc_addr = max(address_stats['btc'].items(), key=lambda x: x[1]['alerts'], default=(None, {'alerts': 0}))
-    top_eth_addr = max(address_stats['eth'].items(), key=lambda x: x[1]['alerts'], default=(None, {'alerts': 0}))
+    with stats_lock:
+        top_btc_addr = max(address_stats['btc'].items(), key=lambda x: x[1]['alerts'], default=(None, {'alerts': 0}))
+        top_eth_addr = max(address_stats['eth'].items(), key=lambda x: x[1]['alerts'], default=(None, {'alerts': 0}))
     
-    message = f"""
+    parts = [f"""
 📊 <b>Daily Report - Incoming Transfers</b>
 📅 <b>Date:</b> {datetime.now().strftime('%Y-%m-%d')}
 
@@ -296,25 +504,25 @@ def send_daily_report():
 • Transfers ≥ ${MINIMUM_USD_VALUE}: {total_btc_alerts}
 • Filtered: {total_btc_filtered}
 • Total Value: ${total_btc_value:,.2f}
-• Monitoring: {len(MONITORED_ADDRESSES['btc'])} addresses
+• Monitoring: {btc_count} addresses
 
 ⟠ <b>ETH Summary:</b>
 • Transfers ≥ ${MINIMUM_USD_VALUE}: {total_eth_alerts}
 • Filtered: {total_eth_filtered}
 • Total Value: ${total_eth_value:,.2f}
-• Monitoring: {len(MONITORED_ADDRESSES['eth'])} addresses
+• Monitoring: {eth_count} addresses
+
+🏆 <b>Most Active (Incoming ≥ ${MINIMUM_USD_VALUE}):</b>"""]
 
-🏆 <b>Most Active (Incoming ≥ ${MINIMUM_USD_VALUE}):</b>"""
-    
     if top_btc_addr[0] and top_btc_addr[1]['alerts'] > 0:
         btc_label = get_address_label(top_btc_addr[0], 'btc')
-        message += f"\n₿ {btc_label}: {top_btc_addr[1]['alerts']} transfers"
-    
+        parts.append(f"\n₿ {btc_label}: {top_btc_addr[1]['alerts']} transfers")
+
     if top_eth_addr[0] and top_eth_addr[1]['alerts'] > 0:
         eth_label = get_address_label(top_eth_addr[0], 'eth')
-        message += f"\n⟠ {eth_label}: {top_eth_addr[1]['alerts']} transfers"
-    
-    message += f"""
+        parts.append(f"\n⟠ {eth_label}: {top_eth_addr[1]['alerts']} transfers")
+
+    parts.append(f"""
 
 💰 <b>Current Prices:</b>
 ₿ BTC: ${crypto_prices['btc']:,.2f}
@@ -326,191 +534,272 @@ def send_daily_report():
 🗑️ Dust Filter: {'Enabled' if IGNORE_DUST_TRANSACTIONS else 'Disabled'}
 
 🟢 <b>Status:</b> All systems operational
-"""
-    
+""")
+
+    message = "".join(parts)
+
     try:
-        bot.send_message(CHAT_ID, message, parse_mode='HTML')
+        telegram_sender.send(message)
         logging.info("Daily report sent successfully")
     except Exception as e:
         logging.error(f"Error sending daily report: {e}")
 
-def format_btc_message(tx_data, matched_address, received_amount_satoshi):
+def format_btc_message(tx, matched_address, received_amount_satoshi, input_addrs=()):
     """จัดรูปแบบข้อความ BTC (เฉพาะการโอนเข้า)"""
-    global address_stats
-    
-    tx = tx_data.get('x', {})
     value_btc = received_amount_satoshi / 10**8
     usd_value = value_btc * crypto_prices['btc']
-    tx_hash = tx.get('hash', 'Unknown')
+    tx_hash = tx.hash or 'Unknown'
     
-    # Update statistics
-    address_stats['btc'][matched_address]['alerts'] += 1
-    address_stats['btc'][matched_address]['total_value'] += usd_value
-    health_status['total_alerts'] += 1
+    # Update statistics in this thread's shard (folded in by the scheduler);
+    # the returned total already combines folded and pending alerts
+    alert_count = _bump_shard(_get_stat_shard(), 'btc', matched_address,
+                              alerts=1, value=usd_value)
     
     # Get address label
     address_label = get_address_label(matched_address, 'btc')
     
-    # หา addresses ที่ส่งมา
-    input_addrs = []
-    for inp in tx.get('inputs', []):
-        if 'prev_out' in inp and 'addr' in inp['prev_out']:
-            input_addrs.append(inp['prev_out']['addr'])
-    
-    from_addr = input_addrs[0] if input_addrs else 'Unknown'
-    
-    message = f"""
-🔔 <b>BTC Incoming Transaction</b>
-
-📥 <b>To:</b> {address_label}
-💰 <b>Amount:</b> {value_btc:.8f} BTC
-💵 <b>USD Value:</b> ${usd_value:,.2f}
-
-📤 <b>From:</b> <code>{from_addr[:15] if from_addr != 'Unknown' else 'Unknown'}...</code>
-📍 <b>Address:</b> <code>{matched_address[:15]}...{matched_address[-8:]}</code>
-
-🔗 <b>Hash:</b> <code>{tx_hash[:20]}...</code>
-⏰ <b>Time:</b> {datetime.now().strftime('%H:%M:%S')}
-📊 <b>Alert #:</b> {address_stats['btc'][matched_address]['alerts']}
-📈 <b>Type:</b> Incoming Transfer
-
-<a href="https://blockchain.info/tx/{tx_hash}">View Transaction</a>
-"""
-    return message
+    # ใช้ input addresses ที่ caller รวบรวมไว้แล้ว ไม่ต้องไล่ tx.inputs ซ้ำ
+    from_addr = next(iter(input_addrs), 'Unknown')
+
+    return _BTC_ALERT_TEMPLATE(
+        label=address_label,
+        value_btc=value_btc,
+        usd_value=usd_value,
+        from_addr=from_addr[:15] if from_addr != 'Unknown' else 'Unknown',
+        short_addr=SHORT_BTC[matched_address],
+        short_hash=tx_hash[:20],
+        alert_time=time.strftime('%H:%M:%S'),
+        alert_count=alert_count,
+        tx_hash=tx_hash
+    )
 
 # WebSocket handlers
 def on_btc_message(ws, message):
     try:
-        data = json.loads(message)
-        if data.get('op') == 'utx':
-            tx = data.get('x', {})
-            tx_hash = tx.get('hash')
+        # Skip the decode entirely when no watched address appears in the
+        # raw payload (pings, status frames, anything not ours)
+        if not any(addr in message for addr in _BTC_ADDR_SUBSTRINGS):
+            return
+
+        frame = _frame_decoder.decode(message)
+        if frame.op == 'utx' and frame.x is not None:
+            tx = frame.x
+            tx_hash = tx.hash
             
             if tx_hash and tx_hash not in processed_transactions:
+                # Hoist per-message lookups out of the output loop
+                btc_set = MONITORED_SET['btc']
+                min_usd = MINIMUM_USD_VALUE
+                min_satoshi = BTC_MIN_SATOSHI
+                usd_per_satoshi = crypto_prices['btc'] / 100000000
+
+                # รวบรวม input addresses ครั้งเดียวต่อธุรกรรม (O(inputs) แทน O(outputs × inputs))
+                input_addrs = {
+                    inp.prev_out.addr
+                    for inp in tx.inputs
+                    if inp.prev_out is not None and inp.prev_out.addr
+                }
+
                 # ตรวจสอบเฉพาะการโอนเข้า (outputs) ไปยัง monitored addresses
-                for out in tx.get('out', []):
-                    output_addr = out.get('addr')
-                    if output_addr in MONITORED_ADDRESSES['btc']:
-                        # ตรวจสอบว่าเป็นการโอนเข้าจริงๆ (ไม่ใช่การโอนออก)
-                        is_incoming = True
-                        
+                for out in tx.out:
+                    output_addr = out.addr
+                    if output_addr in btc_set:
+                        # Swap the decoded string for the interned watchlist
+                        # copy so the stat-dict lookups hash/compare once
+                        output_addr = sys.intern(output_addr)
                         # ตรวจสอบว่า address นี้ไม่ได้เป็น input (ผู้ส่ง) ในธุรกรรมเดียวกัน
-                        for inp in tx.get('inputs', []):
-                            if 'prev_out' in inp and inp['prev_out'].get('addr') == output_addr:
-                                is_incoming = False
-                                break
-                        
+                        is_incoming = output_addr not in input_addrs
+
                         if is_incoming:
-                            received_amount = out.get('value', 0)
+                            received_amount = out.value
                             received_btc = received_amount / 100000000
-                            usd_value = received_btc * crypto_prices['btc']
-                            
-                            # ตรวจสอบมูลค่าขั้นต่ำ
-                            if usd_value >= MINIMUM_USD_VALUE:
+                            usd_value = received_amount * usd_per_satoshi
+                            addr_label = get_address_label(output_addr, 'btc')
+
+                            # ตรวจสอบมูลค่าขั้นต่ำด้วย integer compare เดียว
+                            if received_amount >= min_satoshi:
                                 # ส่งแจ้งเตือนเฉพาะเมื่อเป็นการโอนเข้าและมูลค่าเพียงพอ
                                 if received_amount > 0:
-                                    message_text = format_btc_message(data, output_addr, received_amount)
-                                    
+                                    message_text = format_btc_message(tx, output_addr, received_amount, input_addrs)
+
                                     try:
-                                        bot.send_message(CHAT_ID, message_text, parse_mode='HTML', disable_web_page_preview=True)
+                                        alert_queue.put_nowait(message_text)
                                         processed_transactions.add(tx_hash)
-                                        
-                                        addr_label = get_address_label(output_addr, 'btc')
-                                        logging.info(f"✅ BTC incoming alert sent: {addr_label} - {received_btc:.8f} BTC (${usd_value:.2f}) - {tx_hash[:10]}...")
-                                    except Exception as e:
-                                        logging.error(f"Error sending BTC message: {e}")
+
+                                        logging.info(f"✅ BTC incoming alert queued: {addr_label} - {received_btc:.8f} BTC (${usd_value:.2f}) - {tx_hash[:10]}...")
+                                    except queue.Full:
+                                        logging.error("Alert queue full, dropping BTC alert")
                                         health_status['errors_count'] += 1
                                     break
                             else:
-                                # บันทึกธุรกรรมที่ถูกกรองออก
-                                address_stats['btc'][output_addr]['filtered_count'] += 1
-                                health_status['total_filtered'] += 1
+                                # บันทึกธุรกรรมที่ถูกกรองออกใน shard ของ thread นี้
+                                _bump_shard(_get_stat_shard(), 'btc', output_addr, filtered=1)
                                 processed_transactions.add(tx_hash)
-                                filtered_transactions.add(tx_hash)
-                                
-                                addr_label = get_address_label(output_addr, 'btc')
-                                logging.info(f"🔇 BTC transaction filtered (below ${MINIMUM_USD_VALUE}): {addr_label} - {received_btc:.8f} BTC (${usd_value:.2f}) - {tx_hash[:10]}...")
+
+                                logging.info(f"🔇 BTC transaction filtered (below ${min_usd}): {addr_label} - {received_btc:.8f} BTC (${usd_value:.2f}) - {tx_hash[:10]}...")
                                 break
                         
     except Exception as e:
         logging.error(f"Error processing BTC message: {e}")
         health_status['errors_count'] += 1
 
-def on_btc_error(ws, error):
-    logging.error(f"BTC WebSocket error: {error}")
-    health_status['websocket_btc'] = 'error'
-    health_status['errors_count'] += 1
+async def consume_btc_websocket():
+    """BTC feed coroutine — รับข้อความจาก Blockchain.info
+
+    websockets.connect used as an async iterator reconnects on failure
+    with its own exponential backoff, replacing the manual sleep loop.
+    """
+    health_status['websocket_btc'] = 'connecting'
+    async for ws in websockets.connect("wss://ws.blockchain.info/inv"):
+        try:
+            logging.info("🔗 BTC WebSocket connected")
+            health_status['websocket_btc'] = 'connected'
+            # Subscribe per watched address instead of the mempool-wide
+            # unconfirmed_sub firehose — the server then only delivers
+            # transactions touching our addresses
+            for addr in MONITORED_ADDRESSES['btc']:
+                await ws.send(_json_dumps({"op": "addr_sub", "addr": addr}))
+            async for message in ws:
+                on_btc_message(ws, message)
+            health_status['websocket_btc'] = 'disconnected'
+            logging.warning("BTC WebSocket connection closed")
+        except websockets.ConnectionClosed:
+            health_status['websocket_btc'] = 'disconnected'
+            logging.warning("BTC WebSocket connection closed")
+        except Exception as e:
+            logging.error(f"BTC WebSocket error: {e}")
+            health_status['websocket_btc'] = 'error'
+            health_status['errors_count'] += 1
+
+class TelegramSender:
+    """ส่งข้อความแจ้งเตือนตรงไปยัง Telegram API ผ่าน connection เดียว
+
+    telebot rebuilds the request params and connection per call; for the
+    alert path we keep one keep-alive session and only substitute the text.
+    telebot stays in place for command handling.
+    """
+
+    def __init__(self, token, chat_id):
+        self.url = f"https://api.telegram.org/bot{token}/sendMessage"
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=2))
+        self.base = {
+            'chat_id': chat_id,
+            'parse_mode': 'HTML',
+            'disable_web_page_preview': True
+        }
 
-def on_btc_close(ws, close_status_code, close_msg):
-    logging.warning("BTC WebSocket connection closed")
-    health_status['websocket_btc'] = 'disconnected'
+    def send(self, text):
+        response = self.session.post(self.url, data={**self.base, 'text': text}, timeout=5)
+        response.raise_for_status()
 
-def on_btc_open(ws):
-    logging.info("🔗 BTC WebSocket connected")
-    health_status['websocket_btc'] = 'connected'
-    subscribe_message = {"op": "unconfirmed_sub"}
-    ws.send(json.dumps(subscribe_message))
+telegram_sender = TelegramSender(TELEGRAM_TOKEN, CHAT_ID)
 
-def start_btc_websocket():
-    def run_btc_ws():
-        while True:
+def alert_sender():
+    """ส่งแจ้งเตือนจากคิว (จำกัดความเร็วไม่เกิน ~25 ข้อความ/วินาที)
+
+    Alerts arriving within the coalesce window are batched into one
+    Telegram message (up to the 4096-char API limit), so a burst of
+    matches costs one API round-trip instead of one per alert.
+    """
+    min_send_interval = 1 / 25
+    coalesce_window = 0.2
+    max_message_len = 4000  # headroom under Telegram's 4096-char limit
+    while True:
+        batch = [alert_queue.get()]
+        batch_len = len(batch[0])
+        deadline = time.monotonic() + coalesce_window
+        while batch_len < max_message_len:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
             try:
-                health_status['websocket_btc'] = 'connecting'
-                ws = websocket.WebSocketApp(
-                    "wss://ws.blockchain.info/inv",
-                    on_open=on_btc_open,
-                    on_message=on_btc_message,
-                    on_error=on_btc_error,
-                    on_close=on_btc_close
-                )
-                ws.run_forever()
-            except Exception as e:
-                logging.error(f"BTC WebSocket crashed: {e}")
-                health_status['websocket_btc'] = 'error'
-                health_status['errors_count'] += 1
-                time.sleep(10)
-    
-    thread = threading.Thread(target=run_btc_ws)
+                message_text = alert_queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if batch_len + len(message_text) > max_message_len:
+                # Doesn't fit — send what we have and start a new batch
+                try:
+                    telegram_sender.send('\n'.join(batch))
+                except Exception as e:
+                    logging.error(f"Error sending Telegram alert: {e}")
+                    health_status['errors_count'] += 1
+                time.sleep(min_send_interval)
+                batch = [message_text]
+                batch_len = len(message_text)
+                deadline = time.monotonic() + coalesce_window
+                continue
+            batch.append(message_text)
+            batch_len += len(message_text) + 1
+        try:
+            telegram_sender.send('\n'.join(batch))
+        except Exception as e:
+            logging.error(f"Error sending Telegram alert: {e}")
+            health_status['errors_count'] += 1
+        time.sleep(min_send_interval)
+
+def start_alert_sender():
+    thread = threading.Thread(target=alert_sender)
     thread.daemon = True
     thread.start()
     return thread
 
-def update_prices_periodically():
-    """อัพเดทราคาตามกำหนด"""
-    while True:
-        get_crypto_prices()
-        time.sleep(PRICE_UPDATE_INTERVAL)
+def start_btc_websocket():
+    """Run all feed coroutines on one shared event loop in a single thread"""
+    loop = asyncio.new_event_loop()
 
-def send_health_periodically():
-    """ส่ง health check ตามกำหนด"""
-    while True:
-        time.sleep(HEALTH_CHECK_INTERVAL)
-        send_daily_report()
+    def run_ws_loop():
+        asyncio.set_event_loop(loop)
+        loop.create_task(consume_btc_websocket())
+        loop.run_forever()
+
+    thread = threading.Thread(target=run_ws_loop)
+    thread.daemon = True
+    thread.start()
+    return thread
 
 def cleanup_processed_transactions():
-    """ล้าง processed transactions ทุก 24 ชั่วโมง"""
+    """สร้าง dedup filter ใหม่เมื่อโตเกิน TX_DEDUP_CAPACITY"""
     global processed_transactions
-    while True:
-        time.sleep(86400)  # 24 ชั่วโมง
-        processed_transactions.clear()
-        logging.info("Cleared processed transactions cache")
+    if len(processed_transactions) > TX_DEDUP_CAPACITY:
+        processed_transactions = ScalableBloomFilter(initial_capacity=100_000, error_rate=1e-4)
+        logging.info("Rebuilt processed transactions filter (capacity reached)")
 
 def reset_daily_stats():
     """รีเซ็ตสถิติประจำวัน"""
-    global address_stats
-    while True:
-        time.sleep(86400)  # 24 ชั่วโมง
-        # Reset daily counters but keep total_value
+    # Reset daily counters but keep total_value
+    with stats_lock:
         for crypto_type in address_stats:
             for addr in address_stats[crypto_type]:
                 address_stats[crypto_type][addr]['alerts'] = 0
                 address_stats[crypto_type][addr]['filtered_count'] = 0
-        
+
         # Reset global counters
         health_status['total_alerts'] = 0
         health_status['total_filtered'] = 0
-        
-        logging.info("Reset daily statistics (alerts and filtered counts)")
+        for totals in running_totals.values():
+            totals['alerts'] = 0
+            totals['filtered'] = 0
+
+    logging.info("Reset daily statistics (alerts and filtered counts)")
+
+def run_scheduler():
+    """รัน jobs ตามกำหนดทั้งหมดใน thread เดียว"""
+    schedule.every(1).seconds.do(flush_stat_shards)
+    schedule.every(PRICE_UPDATE_INTERVAL).seconds.do(get_crypto_prices)
+    schedule.every(HEALTH_CHECK_INTERVAL).seconds.do(send_daily_report)
+    schedule.every(60).seconds.do(cleanup_processed_transactions)
+    schedule.every(24).hours.do(reset_daily_stats)
+
+    while True:
+        schedule.run_pending()
+        time.sleep(1)
+
+def start_scheduler():
+    thread = threading.Thread(target=run_scheduler)
+    thread.daemon = True
+    thread.start()
+    return thread
 
 def handle_telegram_commands():
     """Handle Telegram bot commands"""
@@ -547,10 +836,8 @@ def handle_telegram_commands():
     @bot.message_handler(commands=['status'])
     def send_status(message):
         uptime_hours = (time.time() - start_time) / 3600
-        total_alerts = sum(stats['alerts'] for stats in address_stats['btc'].values()) + \
-                      sum(stats['alerts'] for stats in address_stats['eth'].values())
-        total_filtered = sum(stats['filtered_count'] for stats in address_stats['btc'].values()) + \
-                        sum(stats['filtered_count'] for stats in address_stats['eth'].values())
+        total_alerts = running_totals['btc']['alerts'] + running_totals['eth']['alerts']
+        total_filtered = running_totals['btc']['filtered'] + running_totals['eth']['filtered']
         
         status_text = f"""
 📊 <b>Bot Status</b>
@@ -606,14 +893,15 @@ def handle_telegram_commands():
     
     @bot.message_handler(commands=['stats'])
     def send_stats(message):
-        # Calculate totals
-        total_btc_alerts = sum(stats['alerts'] for stats in address_stats['btc'].values())
-        total_eth_alerts = sum(stats['alerts'] for stats in address_stats['eth'].values())
-        total_btc_value = sum(stats['total_value'] for stats in address_stats['btc'].values())
-        total_eth_value = sum(stats['total_value'] for stats in address_stats['eth'].values())
-        total_btc_filtered = sum(stats['filtered_count'] for stats in address_stats['btc'].values())
-        total_eth_filtered = sum(stats['filtered_count'] for stats in address_stats['eth'].values())
+        # Read the running totals instead of rescanning every address
+        total_btc_alerts = running_totals['btc']['alerts']
+        total_eth_alerts = running_totals['eth']['alerts']
+        total_btc_value = running_totals['btc']['value']
+        total_eth_value = running_totals['eth']['value']
+        total_btc_filtered = running_totals['btc']['filtered']
+        total_eth_filtered = running_totals['eth']['filtered']
         
         # Find top performers
-        top_btc = sorted(address_stats['btc'].items(), key=lambda x: x[1]['alerts'], reverse=True)[:3]
-        top_eth = sorted(address_stats['eth'].items(), key=lambda x: x[1]['alerts'], reverse=True)[:3]
+        with stats_lock:
+            top_btc = sorted(address_stats['btc'].items(), key=lambda x: x[1]['alerts'], reverse=True)[:3]
+            top_eth = sorted(address_stats['eth'].items(), key=lambda x: x[1]['alerts'], reverse=True)[:3]
@@ -1,4 +1,7 @@
 import os
+import re
+import sys
+from functools import lru_cache
 from typing import List, Dict
 
 # Telegram Configuration
@@ -22,7 +25,8 @@ def parse_addresses(env_var: str) -> List[str]:
     validated_addresses = []
     for addr in addr_list:
         if validate_address_format(addr):
-            validated_addresses.append(addr)
+            # Interned so hot-path dict lookups can compare by identity
+            validated_addresses.append(sys.intern(addr))
         else:
             print(f"⚠️ Invalid address format: {addr}")
     
@@ -42,26 +46,27 @@ def parse_labels(env_var: str) -> Dict[str, str]:
     
     return label_dict
 
+# Legacy base58 BTC, bech32 BTC, and hex ETH formats in one precompiled
+# pattern so validation is a single C-level match
+_ADDRESS_RE = re.compile(
+    r'^(?:'
+    r'[13][a-km-zA-HJ-NP-Z1-9]{25,34}'       # BTC legacy (base58)
+    r'|(?:bc1|tb1)[a-z0-9]{23,59}'           # BTC bech32
+    r'|0x[0-9a-fA-F]{40}'                    # ETH
+    r')$'
+)
+
 def validate_address_format(address: str) -> bool:
     """Basic address format validation"""
-    if not address:
-        return False
-    
-    # BTC address patterns
-    if (address.startswith('1') or address.startswith('3') or 
-        address.startswith('bc1') or address.startswith('tb1')):
-        return len(address) >= 26 and len(address) <= 62
-    
-    # ETH address pattern
-    if address.startswith('0x'):
-        return len(address) == 42 and all(c in '0123456789abcdefABCDEF' for c in address[2:])
-    
-    return False
+    return bool(address) and _ADDRESS_RE.match(address) is not None
 
+@lru_cache(maxsize=4096)
 def get_address_label(address: str, crypto_type: str) -> str:
-    """Get human-readable label for address"""
-    labels = ADDRESS_LABELS.get(crypto_type, {})
-    return labels.get(address, f"{address[:8]}...{address[-6:]}")
+    """Get human-readable label for address (O(1) precomputed lookup, memoized)"""
+    labels = ADDRESS_LABEL_MAP.get(crypto_type)
+    if labels is not None and address in labels:
+        return labels[address]
+    return ADDRESS_LABELS.get(crypto_type, {}).get(address, f"{address[:8]}...{address[-6:]}")
 
 # Parse monitored addresses
 MONITORED_ADDRESSES = {
@@ -69,12 +74,29 @@ MONITORED_ADDRESSES = {
     'eth': parse_addresses('ETH_ADDRESSES')
 }
 
+# Frozenset copies for O(1) membership checks on the WebSocket hot path
+# (the lists above are kept for ordered display)
+MONITORED_SET = {
+    'btc': frozenset(MONITORED_ADDRESSES['btc']),
+    'eth': frozenset(MONITORED_ADDRESSES['eth'])
+}
+
 # Parse address labels
 ADDRESS_LABELS = {
     'btc': parse_labels('BTC_LABELS'),
     'eth': parse_labels('ETH_LABELS')
 }
 
+# Labels (including the shortened default form) resolved once at import
+# so lookups on the alert path are a single dict hit
+ADDRESS_LABEL_MAP = {
+    crypto_type: {
+        addr: ADDRESS_LABELS[crypto_type].get(addr, f"{addr[:8]}...{addr[-6:]}")
+        for addr in MONITORED_ADDRESSES[crypto_type]
+    }
+    for crypto_type in MONITORED_ADDRESSES
+}
+
 # Alert Filtering Settings
 MINIMUM_USD_VALUE = float(os.getenv('MINIMUM_USD_VALUE', '2.0'))           # Default $2 USD minimum
 IGNORE_DUST_TRANSACTIONS = os.getenv('IGNORE_DUST_TRANSACTIONS', 'true').lower() == 'true'
@@ -98,15 +120,16 @@ if not CHAT_ID:
 if not MONITORED_ADDRESSES['btc'] and not MONITORED_ADDRESSES['eth']:
     raise ValueError("At least one BTC or ETH address must be specified")
 
-# Display configuration summary
-total_btc = len(MONITORED_ADDRESSES['btc'])
-total_eth = len(MONITORED_ADDRESSES['eth'])
-print(f"📊 Configuration loaded: {total_btc} BTC addresses, {total_eth} ETH addresses")
-print(f"💰 Minimum alert value: ${MINIMUM_USD_VALUE}")
-print(f"🗑️ Ignore dust transactions: {IGNORE_DUST_TRANSACTIONS}")
+def print_config_summary():
+    """Display configuration summary (call once at startup, not at import)"""
+    total_btc = len(MONITORED_ADDRESSES['btc'])
+    total_eth = len(MONITORED_ADDRESSES['eth'])
+    print(f"📊 Configuration loaded: {total_btc} BTC addresses, {total_eth} ETH addresses")
+    print(f"💰 Minimum alert value: ${MINIMUM_USD_VALUE}")
+    print(f"🗑️ Ignore dust transactions: {IGNORE_DUST_TRANSACTIONS}")
 
-if total_btc > 0:
-    print(f"₿ BTC Addresses: {', '.join([get_address_label(addr, 'btc') for addr in MONITORED_ADDRESSES['btc'][:3]])}{'...' if total_btc > 3 else ''}")
+    if total_btc > 0:
+        print(f"₿ BTC Addresses: {', '.join([get_address_label(addr, 'btc') for addr in MONITORED_ADDRESSES['btc'][:3]])}{'...' if total_btc > 3 else ''}")
 
-if total_eth > 0:
-    print(f"⟠ ETH Addresses: {', '.join([get_address_label(addr, 'eth') for addr in MONITORED_ADDRESSES['eth'][:3]])}{'...' if total_eth > 3 else ''}")
+    if total_eth > 0:
+        print(f"⟠ ETH Addresses: {', '.join([get_address_label(addr, 'eth') for addr in MONITORED_ADDRESSES['eth'][:3]])}{'...' if total_eth > 3 else ''}")
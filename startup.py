@@ -1,26 +1,36 @@
 #!/usr/bin/env python3
 """Startup script for Railway deployment"""
 
+import os
 import threading
-import time
 import logging
-from flask import Flask
 from bot import main, app
+from config import print_config_summary
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
-    
+
+    # Set once Flask serves its first request (Railway probes /health right
+    # away), so the bot starts as soon as the server is actually up instead
+    # of sleeping a fixed 3 seconds
+    flask_ready = threading.Event()
+
+    @app.before_request
+    def _mark_flask_ready():
+        flask_ready.set()
+
     # Start Flask server in background
     def run_flask():
         port = int(os.environ.get('PORT', 8080))
         app.run(host='0.0.0.0', port=port, debug=False)
-    
+
     flask_thread = threading.Thread(target=run_flask)
     flask_thread.daemon = True
     flask_thread.start()
-    
-    # Give Flask time to start
-    time.sleep(3)
-    
+
+    # Wait for readiness, but never longer than the old fixed delay needed
+    flask_ready.wait(timeout=5.0)
+
     # Start the main bot
+    print_config_summary()
     main()
@@ -1,20 +1,162 @@
 #!/usr/bin/env python3
 """Bulk operations for managing large numbers of addresses"""
 
+import asyncio
+import json
+import re
 import requests
 import time
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
 import sys
 from datetime import datetime
+from functools import lru_cache
+from operator import itemgetter
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _loads_response(content):
+    """Decode a JSON response body with orjson when available"""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+# On-disk TTL cache so repeated runs within a few minutes reuse
+# responses instead of re-fetching every address
+CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.btc_balance_cache.json')
+CACHE_TTL = 300  # seconds
+
+# Reject malformed addresses locally instead of paying a round trip for
+# the API to do it
+_BTC_RE = re.compile(r'^(bc1[ac-hj-np-z02-9]{11,71}|[13][a-km-zA-HJ-NP-Z1-9]{25,34})$')
+_ETH_RE = re.compile(r'^0x[0-9a-fA-F]{40}$')
+
+@lru_cache(maxsize=1)
+def _env_values():
+    """Parse .env once per process (cached for tools that chain calls)"""
+    try:
+        from dotenv import dotenv_values
+        values = {k: v for k, v in dotenv_values('.env').items() if v is not None}
+        if values:
+            print("📄 Loaded .env file")
+        else:
+            print("⚠️ No .env file found, using system environment")
+        return values
+    except ImportError:
+        print("💡 Install python-dotenv: pip install python-dotenv")
+        return {}
+
+def get_env(key, default=''):
+    """Read a setting from the cached .env values, then the environment"""
+    value = _env_values().get(key)
+    if value is None:
+        value = os.getenv(key, default)
+    return value
+
+def short_addr(address):
+    """Shortened display form — plain concat beats f-string formatting in loops"""
+    return address[:8] + '...' + address[-6:]
+
+class TokenBucket:
+    """Token-bucket rate limiter shared by the sync and async paths"""
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic()
+    
+    def _reserve(self):
+        """Take one token, returning how long to wait for it"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+    
+    def acquire(self):
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+    
+    async def acquire_async(self):
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
 
 class BulkAddressOperations:
-    def __init__(self):
+    def __init__(self, use_cache=True):
+        self.use_cache = use_cache
+        self._cache = self._load_cache() if use_cache else {}
+        # Pace requests at the provider's actual limit instead of a blanket
+        # one-second sleep per batch
+        self.limiter = TokenBucket(rate=10)
         self.session = requests.Session()
+        # Pooled keep-alive connections with backoff on 429/5xx, so the
+        # sync path reuses TLS sessions and survives rate limiting
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=16,
+            max_retries=Retry(total=3, backoff_factor=0.5,
+                              status_forcelist=[429, 500, 502, 503, 504])
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         self.session.headers.update({
             'User-Agent': 'CryptoMonitor/1.0'
         })
+        # One long-lived aiohttp session (and the loop it's bound to) shared
+        # by every async batch — one DNS lookup + TLS handshake per run,
+        # not one per batch
+        self._loop = None
+        self._aio_session = None
+    
+    def close(self):
+        """Close the shared aiohttp session and its event loop"""
+        if self._aio_session is not None:
+            self._loop.run_until_complete(self._aio_session.close())
+            self._aio_session = None
+        if self._loop is not None:
+            self._loop.close()
+            self._loop = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def _run(self, coro):
+        """Drive a coroutine on the operation-lifetime event loop"""
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(coro)
     
-    def check_btc_balances(self, addresses, batch_size=10):
+    async def _get_aio_session(self):
+        if self._aio_session is None:
+            self._aio_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=16, ttl_dns_cache=300,
+                                               keepalive_timeout=60),
+                headers={'User-Agent': 'CryptoMonitor/1.0'}
+            )
+        return self._aio_session
+    
+    def check_btc_balances(self, addresses, batch_size=100):
         """Check BTC balances for multiple addresses"""
         results = {}
         
@@ -27,21 +169,143 @@ class BulkAddressOperations:
             results.update(batch_results)
             
             print(f"⏳ Progress: {min(i+batch_size, len(addresses))}/{len(addresses)}")
-            time.sleep(1)  # Rate limiting
         
         return results
     
+    def _load_cache(self):
+        """Load the on-disk response cache (empty on first run)"""
+        try:
+            with open(CACHE_FILE) as f:
+                return json.load(f)
+        except Exception:
+            return {}
+    
+    def _save_cache(self):
+        try:
+            with open(CACHE_FILE, 'w') as f:
+                json.dump(self._cache, f)
+        except Exception as e:
+            print(f"⚠️ Could not save cache: {e}")
+    
     def _check_btc_batch(self, addresses):
         """Check BTC balances for a batch of addresses"""
         results = {}
+        now = time.time()
+        
+        # Fail malformed addresses locally — no network round trip
+        valid = []
+        for address in addresses:
+            if _BTC_RE.match(address):
+                valid.append(address)
+            else:
+                results[address] = {'status': 'error', 'message': 'Invalid address format'}
+        
+        # Serve fresh cache entries without any network call
+        pending = []
+        for address in valid:
+            entry = self._cache.get(address) if self.use_cache else None
+            if entry and now - entry[0] < CACHE_TTL:
+                results[address] = entry[1]
+            else:
+                pending.append(address)
+        
+        if pending:
+            # One multiaddr call covers the whole batch; fall back to
+            # per-address fetches if the bulk endpoint fails
+            fetched = self._fetch_multiaddr(pending)
+            if fetched is None:
+                if aiohttp is not None:
+                    fetched = self._run(self._check_btc_batch_async(pending))
+                else:
+                    fetched = self._check_btc_batch_sync(pending)
+            
+            if self.use_cache:
+                for address, result in fetched.items():
+                    if result.get('status') == 'success':
+                        self._cache[address] = [now, result]
+                self._save_cache()
+            
+            results.update(fetched)
+        
+        return results
+    
+    async def _check_btc_batch_async(self, addresses):
+        """Fetch a batch of addresses concurrently with aiohttp"""
+        results = {}
+        sem = asyncio.Semaphore(16)
+        session = await self._get_aio_session()
+        
+        tasks = [self._fetch_one(session, sem, address) for address in addresses]
+        for address, result in zip(addresses, await asyncio.gather(*tasks)):
+            results[address] = result
+        
+        return results
+    
+    async def _fetch_one(self, session, sem, address):
+        """Fetch one address, returning the same result dict as the sync path"""
+        try:
+            url = f"https://blockchain.info/rawaddr/{address}?limit=0"
+            async with sem:
+                for attempt in range(3):
+                    await self.limiter.acquire_async()
+                    async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                        if response.status == 200:
+                            data = _loads_response(await response.read())
+                            return {
+                                'balance': data.get('final_balance', 0) / 100000000,  # Convert to BTC
+                                'tx_count': data.get('n_tx', 0),
+                                'total_received': data.get('total_received', 0) / 100000000,
+                                'total_sent': data.get('total_sent', 0) / 100000000,
+                                'status': 'success'
+                            }
+                        if response.status == 429:
+                            # Honor the server's pacing hint, then retry
+                            retry_after = float(response.headers.get('Retry-After', 2 ** attempt))
+                            await asyncio.sleep(retry_after)
+                            continue
+                        return {'status': 'error', 'message': f"HTTP {response.status}"}
+                return {'status': 'error', 'message': 'HTTP 429 (rate limited)'}
+        except Exception as e:
+            return {'status': 'error', 'message': str(e)}
+    
+    def _fetch_multiaddr(self, addresses):
+        """Fetch a whole batch in one multiaddr round trip (up to ~100 addresses)"""
+        try:
+            url = 'https://blockchain.info/multiaddr?n=0&active=' + '|'.join(addresses)
+            self.limiter.acquire()
+            response = self.session.get(url, timeout=10)
+            if response.status_code != 200:
+                return None
+            data = _loads_response(response.content)
+            
+            results = {}
+            for entry in data.get('addresses', []):
+                results[entry['address']] = {
+                    'balance': entry.get('final_balance', 0) / 100000000,  # Convert to BTC
+                    'tx_count': entry.get('n_tx', 0),
+                    'total_received': entry.get('total_received', 0) / 100000000,
+                    'total_sent': entry.get('total_sent', 0) / 100000000,
+                    'status': 'success'
+                }
+            for address in addresses:
+                if address not in results:
+                    results[address] = {'status': 'error', 'message': 'Not in multiaddr response'}
+            return results
+        except Exception:
+            return None
+    
+    def _check_btc_batch_sync(self, addresses):
+        """Sequential fallback when aiohttp is not installed"""
+        results = {}
         
         for address in addresses:
             try:
                 url = f"https://blockchain.info/rawaddr/{address}?limit=0"
+                self.limiter.acquire()
                 response = self.session.get(url, timeout=10)
                 
                 if response.status_code == 200:
-                    data = response.json()
+                    data = _loads_response(response.content)
                     results[address] = {
                         'balance': data.get('final_balance', 0) / 100000000,  # Convert to BTC
                         'tx_count': data.get('n_tx', 0),
@@ -67,11 +331,6 @@ class BulkAddressOperations:
             print("⚠️ ETH balance checking not implemented yet")
             return []
         
-        # Calculate totals
-        total_balance = 0
-        total_tx_count = 0
-        active_addresses = 0
-        
         report_data = []
         
         for address, data in results.items():
@@ -79,12 +338,6 @@ class BulkAddressOperations:
                 balance = data.get('balance', 0)
                 tx_count = data.get('tx_count', 0)
                 
-                if balance > 0:
-                    active_addresses += 1
-                
-                total_balance += balance
-                total_tx_count += tx_count
-                
                 report_data.append({
                     'address': address,
                     'balance': balance,
@@ -100,8 +353,26 @@ class BulkAddressOperations:
                     'error': data.get('message', 'Unknown error')
                 })
         
-        # Sort by balance (highest first)
-        report_data.sort(key=lambda x: x.get('balance', 0), reverse=True)
+        if np is not None and report_data:
+            # Vectorized totals and sort order — one C loop each instead of
+            # per-entry Python accumulation
+            count = len(report_data)
+            balances = np.fromiter((d['balance'] for d in report_data), dtype=np.float64, count=count)
+            tx_counts = np.fromiter((d['tx_count'] for d in report_data), dtype=np.int64, count=count)
+            total_balance = float(balances.sum())
+            total_tx_count = int(tx_counts.sum())
+            active_addresses = int((balances > 0).sum())
+            
+            # Sort by balance (highest first)
+            report_data = [report_data[i] for i in np.argsort(-balances, kind='stable')]
+        else:
+            total_balance = sum(d['balance'] for d in report_data)
+            total_tx_count = sum(d['tx_count'] for d in report_data)
+            active_addresses = sum(1 for d in report_data if d['balance'] > 0)
+            
+            # Sort by balance (highest first); itemgetter is a C callable,
+            # and every entry populates 'balance'
+            report_data.sort(key=itemgetter('balance'), reverse=True)
         
         # Print report
         print(f"\n📈 {crypto_type.upper()} Balance Report")
@@ -119,12 +390,12 @@ class BulkAddressOperations:
             balance = addr_data['balance']
             status = addr_data['status']
             
-            short_addr = f"{address[:8]}...{address[-6:]}"
+            display = short_addr(address)
             
             if status == 'error':
-                print(f"{i+1:2d}. {short_addr} - ERROR: {addr_data.get('error', 'Unknown')}")
+                print(f"{i+1:2d}. {display} - ERROR: {addr_data.get('error', 'Unknown')}")
             else:
-                print(f"{i+1:2d}. {short_addr} - {balance:.8f} {crypto_type.upper()} ({status})")
+                print(f"{i+1:2d}. {display} - {balance:.8f} {crypto_type.upper()} ({status})")
         
         return report_data
     
@@ -146,8 +417,7 @@ class BulkAddressOperations:
         
         print(f"Found {len(zero_balance)} addresses with zero balance:")
         for addr in zero_balance[:20]:  # Show first 20
-            short_addr = f"{addr[:8]}...{addr[-6:]}"
-            print(f"  • {short_addr}")
+            print(f"  • {short_addr(addr)}")
         
         if len(zero_balance) > 20:
             print(f"  ... and {len(zero_balance) - 20} more")
@@ -166,22 +436,21 @@ def main():
         print("  python bulk_operations.py report         # Generate full report")
         return
     
-    ops = BulkAddressOperations()
+    use_cache = '--no-cache' not in sys.argv
+    if not use_cache:
+        sys.argv.remove('--no-cache')
     
-    # Load addresses from environment
-    try:
-        from dotenv import load_dotenv
-        load_dotenv()
-        print("📄 Loaded .env file")
-    except ImportError:
-        print("💡 Install python-dotenv: pip install python-dotenv")
-    except:
-        print("⚠️ No .env file found, using system environment")
-    
-    btc_addresses = os.getenv('BTC_ADDRESSES', '').split(',')
+    # Context manager so the shared aiohttp session is closed on exit
+    with BulkAddressOperations(use_cache=use_cache) as ops:
+        run_command(ops)
+
+def run_command(ops):
+    """Dispatch the CLI command using the shared operations object"""
+    # Load addresses from the cached .env values
+    btc_addresses = get_env('BTC_ADDRESSES').split(',')
     btc_addresses = [addr.strip() for addr in btc_addresses if addr.strip()]
     
-    eth_addresses = os.getenv('ETH_ADDRESSES', '').split(',')
+    eth_addresses = get_env('ETH_ADDRESSES').split(',')
     eth_addresses = [addr.strip() for addr in eth_addresses if addr.strip()]
     
     if sys.argv[1] == 'balance':
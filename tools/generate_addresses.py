@@ -11,11 +11,18 @@ def load_addresses_from_csv(csv_file):
     labels = {'btc': {}, 'eth': {}}
     
     with open(csv_file, 'r') as f:
-        reader = csv.DictReader(f)
+        # csv.reader + fixed column indices skips the per-row dict that
+        # DictReader allocates
+        reader = csv.reader(f)
+        header = next(reader, [])
+        type_idx = header.index('type')
+        addr_idx = header.index('address')
+        label_idx = header.index('label') if 'label' in header else -1
+        
         for row in reader:
-            crypto_type = row['type'].lower()
-            address = row['address'].strip()
-            label = row.get('label', '').strip()
+            crypto_type = row[type_idx].lower()
+            address = row[addr_idx].strip()
+            label = row[label_idx].strip() if 0 <= label_idx < len(row) else ''
             
             if crypto_type in addresses and address:
                 addresses[crypto_type].append(address)
@@ -1,38 +1,128 @@
 #!/usr/bin/env python3
 """Import/Export addresses between different formats"""
 
+import io
 import json
 import csv
+import os
 import time
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
 from typing import Dict, List
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# CSV files above this size are split by byte range across worker
+# processes (assumes no quoted newlines, true for address dumps)
+PARALLEL_IMPORT_THRESHOLD = 10 * 1024 * 1024
+
+def _parse_csv_chunk(csv_file, start, end, skip_first, type_idx, addr_idx, label_idx):
+    """Parse one byte range of the CSV in a worker process"""
+    addresses = {'btc': [], 'eth': []}
+    labels = {'btc': {}, 'eth': {}}
+    
+    with open(csv_file, 'rb') as f:
+        f.seek(start)
+        if skip_first:
+            f.readline()  # partial line owned by the previous chunk
+        data = f.read(end - f.tell())
+        data += f.readline()  # finish the line spanning the boundary
+    
+    for row in csv.reader(io.StringIO(data.decode('utf-8', errors='replace'))):
+        if not row:
+            continue
+        crypto_type = row[type_idx].lower()
+        address = row[addr_idx].strip()
+        label = row[label_idx].strip() if 0 <= label_idx < len(row) else ''
+        
+        if crypto_type in addresses and address:
+            addresses[crypto_type].append(address)
+            if label:
+                labels[crypto_type][address] = label
+    
+    return addresses, labels
+
 class AddressManager:
     def __init__(self):
         self.addresses = {'btc': [], 'eth': []}
         self.labels = {'btc': {}, 'eth': {}}
+        # Set twins of the address lists for O(1) dedup on import; the
+        # lists keep insertion order for export
+        self.seen = {'btc': set(), 'eth': set()}
+    
+    def _rebuild_seen(self):
+        self.seen = {crypto_type: set(addrs) for crypto_type, addrs in self.addresses.items()}
     
     def import_from_csv(self, csv_file: str):
         """Import addresses from CSV file"""
+        if os.path.getsize(csv_file) > PARALLEL_IMPORT_THRESHOLD:
+            self._import_from_csv_parallel(csv_file)
+            return
+        
         with open(csv_file, 'r') as f:
-            reader = csv.DictReader(f)
+            # csv.reader + fixed column indices skips the per-row dict that
+            # DictReader allocates
+            reader = csv.reader(f)
+            header = next(reader, [])
+            type_idx = header.index('type')
+            addr_idx = header.index('address')
+            label_idx = header.index('label') if 'label' in header else -1
+            
             for row in reader:
-                crypto_type = row['type'].lower()
-                address = row['address'].strip()
-                label = row.get('label', '').strip()
+                crypto_type = row[type_idx].lower()
+                address = row[addr_idx].strip()
+                label = row[label_idx].strip() if 0 <= label_idx < len(row) else ''
                 
-                if crypto_type in self.addresses and address:
+                if crypto_type in self.addresses and address and address not in self.seen[crypto_type]:
+                    self.seen[crypto_type].add(address)
                     self.addresses[crypto_type].append(address)
                     if label:
                         self.labels[crypto_type][address] = label
     
+    def _import_from_csv_parallel(self, csv_file: str):
+        """Fan a large CSV out to one worker per core by byte range"""
+        file_size = os.path.getsize(csv_file)
+        with open(csv_file, 'rb') as f:
+            header = next(csv.reader(io.StringIO(f.readline().decode('utf-8'))))
+            body_start = f.tell()
+        
+        type_idx = header.index('type')
+        addr_idx = header.index('address')
+        label_idx = header.index('label') if 'label' in header else -1
+        
+        workers = os.cpu_count() or 1
+        chunk_size = max(1, (file_size - body_start) // workers)
+        jobs = []
+        for i in range(workers):
+            start = body_start + i * chunk_size
+            end = file_size if i == workers - 1 else start + chunk_size
+            jobs.append((csv_file, start, end, i > 0, type_idx, addr_idx, label_idx))
+        
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = list(pool.map(_parse_csv_chunk, *zip(*jobs)))
+        
+        # Merge in order so exports keep file order; seen-dedup as usual
+        for addresses, labels in chunks:
+            for crypto_type in self.addresses:
+                seen = self.seen[crypto_type]
+                for address in addresses[crypto_type]:
+                    if address not in seen:
+                        seen.add(address)
+                        self.addresses[crypto_type].append(address)
+                self.labels[crypto_type].update(labels[crypto_type])
+    
     def import_from_json(self, json_file: str):
         """Import addresses from JSON file"""
-        with open(json_file, 'r') as f:
-            data = json.load(f)
+        with open(json_file, 'rb') as f:
+            data = orjson.loads(f.read()) if orjson is not None else json.load(f)
         
         self.addresses = data.get('addresses', {'btc': [], 'eth': []})
         self.labels = data.get('labels', {'btc': {}, 'eth': {}})
+        self._rebuild_seen()
     
     def import_from_env(self, env_file: str):
         """Import addresses from .env file"""
@@ -44,76 +134,100 @@ class AddressManager:
                     
                     if key == 'BTC_ADDRESSES':
                         self.addresses['btc'] = [addr.strip() for addr in value.split(',') if addr.strip()]
+                        self._rebuild_seen()
                     elif key == 'ETH_ADDRESSES':
                         self.addresses['eth'] = [addr.strip() for addr in value.split(',') if addr.strip()]
+                        self._rebuild_seen()
                     elif key == 'BTC_LABELS':
-                        for pair in value.split(','):
-                            if ':' in pair:
-                                addr, label = pair.split(':', 1)
-                                self.labels['btc'][addr.strip()] = label.strip()
+                        # dict() over a generator of pairs stays in C instead
+                        # of a per-pair Python loop
+                        self.labels['btc'] = dict(
+                            map(str.strip, pair.split(':', 1))
+                            for pair in value.split(',') if ':' in pair
+                        )
                     elif key == 'ETH_LABELS':
-                        for pair in value.split(','):
-                            if ':' in pair:
-                                addr, label = pair.split(':', 1)
-                                self.labels['eth'][addr.strip()] = label.strip()
+                        self.labels['eth'] = dict(
+                            map(str.strip, pair.split(':', 1))
+                            for pair in value.split(',') if ':' in pair
+                        )
     
     def export_to_csv(self, csv_file: str):
         """Export addresses to CSV file"""
-        with open(csv_file, 'w', newline='') as f:
+        with open(csv_file, 'w', newline='', buffering=1 << 20) as f:
             writer = csv.writer(f)
             writer.writerow(['type', 'address', 'label'])
             
-            for addr in self.addresses['btc']:
-                label = self.labels['btc'].get(addr, '')
-                writer.writerow(['btc', addr, label])
-            
-            for addr in self.addresses['eth']:
-                label = self.labels['eth'].get(addr, '')
-                writer.writerow(['eth', addr, label])
+            # writerows drains the generators in one C loop instead of a
+            # Python-level writerow call per address
+            btc_labels = self.labels['btc']
+            eth_labels = self.labels['eth']
+            writer.writerows(chain(
+                (('btc', addr, btc_labels.get(addr, '')) for addr in self.addresses['btc']),
+                (('eth', addr, eth_labels.get(addr, '')) for addr in self.addresses['eth'])
+            ))
     
-    def export_to_json(self, json_file: str):
+    def export_to_json(self, json_file: str, timestamp=None):
         """Export addresses to JSON file"""
+        if timestamp is None:
+            timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
         data = {
             'addresses': self.addresses,
             'labels': self.labels,
             'metadata': {
                 'total_btc': len(self.addresses['btc']),
                 'total_eth': len(self.addresses['eth']),
-                'export_date': time.strftime('%Y-%m-%d %H:%M:%S')
+                'export_date': timestamp
             }
         }
         
-        with open(json_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        if orjson is not None:
+            # orjson writes bytes directly — no intermediate Python string
+            with open(json_file, 'wb') as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        else:
+            with open(json_file, 'w') as f:
+                json.dump(data, f, indent=2)
     
-    def export_to_env(self, env_file: str):
+    @staticmethod
+    def _write_joined(f, items, sep=','):
+        """Stream items to the file with separators, no intermediate join"""
+        for i, item in enumerate(items):
+            if i:
+                f.write(sep)
+            f.write(item)
+    
+    def export_to_env(self, env_file: str, timestamp=None):
         """Export addresses to .env format"""
-        btc_addresses = ','.join(self.addresses['btc'])
-        eth_addresses = ','.join(self.addresses['eth'])
-        
-        btc_labels = ','.join([f"{addr}:{label}" for addr, label in self.labels['btc'].items()])
-        eth_labels = ','.join([f"{addr}:{label}" for addr, label in self.labels['eth'].items()])
-        
-        content = f"""# Crypto Address Configuration
-# Generated on {time.strftime('%Y-%m-%d %H:%M:%S')}
+        if timestamp is None:
+            timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
+        # Stream each section straight to the (large-buffered) file handle
+        # instead of concatenating the whole .env in memory first
+        with open(env_file, 'w', buffering=1 << 20) as f:
+            f.write(f"""# Crypto Address Configuration
+# Generated on {timestamp}
 
 # BTC Addresses ({len(self.addresses['btc'])} total)
-BTC_ADDRESSES={btc_addresses}
+BTC_ADDRESSES=""")
+            self._write_joined(f, self.addresses['btc'])
+            
+            f.write(f"""
 
 # ETH Addresses ({len(self.addresses['eth'])} total)
-ETH_ADDRESSES={eth_addresses}
-
-# Address Labels
-BTC_LABELS={btc_labels}
-ETH_LABELS={eth_labels}
+ETH_ADDRESSES=""")
+            self._write_joined(f, self.addresses['eth'])
+            
+            f.write("\n\n# Address Labels\nBTC_LABELS=")
+            self._write_joined(f, (f"{addr}:{label}" for addr, label in self.labels['btc'].items()))
+            
+            f.write("\nETH_LABELS=")
+            self._write_joined(f, (f"{addr}:{label}" for addr, label in self.labels['eth'].items()))
+            
+            f.write("""
 
 # Alert Filtering
 MINIMUM_USD_VALUE=2.0
 IGNORE_DUST_TRANSACTIONS=true
-"""
-        
-        with open(env_file, 'w') as f:
-            f.write(content)
+""")
     
     def get_summary(self):
         """Get summary of addresses"""
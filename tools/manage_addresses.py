@@ -5,6 +5,55 @@ import os
 import json
 import time
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Edits are appended to a JSONL write-ahead log so each add/remove costs
+# one O(1) line write instead of re-serializing the whole address book;
+# the log is folded back into addresses.json on exit
+LOG_FILE = 'addresses.jsonl'
+
+def short_addr(address):
+    """Shortened display form — plain concat beats f-string formatting in loops"""
+    return address[:8] + '...' + address[-6:]
+
+def append_log(entry):
+    """Append one edit to the write-ahead log"""
+    with open(LOG_FILE, 'a') as f:
+        if orjson is not None:
+            f.write(orjson.dumps(entry).decode() + '\n')
+        else:
+            f.write(json.dumps(entry) + '\n')
+
+def replay_log(addresses, labels):
+    """Replay logged edits on top of the snapshot"""
+    if not os.path.exists(LOG_FILE):
+        return
+    # One set per chain, built once and kept in sync with the edits, so
+    # each replayed line costs an O(1) membership test instead of a list scan
+    seen = {crypto_type: set(addrs) for crypto_type, addrs in addresses.items()}
+    with open(LOG_FILE) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            entry = orjson.loads(line) if orjson is not None else json.loads(line)
+            crypto_type = entry['type']
+            addr = entry['addr']
+            if entry['op'] == 'add':
+                if addr not in seen[crypto_type]:
+                    seen[crypto_type].add(addr)
+                    addresses[crypto_type].append(addr)
+                if entry.get('label'):
+                    labels[crypto_type][addr] = entry['label']
+            elif entry['op'] == 'remove':
+                if addr in seen[crypto_type]:
+                    seen[crypto_type].discard(addr)
+                    addresses[crypto_type].remove(addr)
+                labels[crypto_type].pop(addr, None)
+
 def load_addresses():
     """Load addresses from various sources"""
     addresses = {'btc': [], 'eth': []}
@@ -12,26 +61,44 @@ def load_addresses():
     
     # Try to load from JSON
     if os.path.exists('addresses.json'):
-        with open('addresses.json', 'r') as f:
-            data = json.load(f)
+        with open('addresses.json', 'rb') as f:
+            data = orjson.loads(f.read()) if orjson is not None else json.load(f)
             addresses = data.get('addresses', addresses)
             labels = data.get('labels', labels)
     
+    replay_log(addresses, labels)
     return addresses, labels
 
-def save_addresses(addresses, labels):
+def compact():
+    """Fold the log into a fresh addresses.json snapshot"""
+    if not os.path.exists(LOG_FILE):
+        return
+    addresses, labels = load_addresses()
+    save_addresses(addresses, labels)
+    os.remove(LOG_FILE)
+
+def save_addresses(addresses, labels, timestamp=None):
     """Save addresses to JSON"""
+    # Format the timestamp once per operation; batch callers can pass
+    # theirs in to skip the localtime() call per save
+    if timestamp is None:
+        timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
     data = {
         'addresses': addresses,
         'labels': labels,
         'metadata': {
             'total': len(addresses['btc']) + len(addresses['eth']),
-            'last_updated': time.strftime('%Y-%m-%d %H:%M:%S')
+            'last_updated': timestamp
         }
     }
     
-    with open('addresses.json', 'w') as f:
-        json.dump(data, f, indent=2)
+    if orjson is not None:
+        # orjson writes bytes directly — no intermediate Python string
+        with open('addresses.json', 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open('addresses.json', 'w') as f:
+            json.dump(data, f, indent=2)
 
 def add_address_interactive():
     """Add address interactively"""
@@ -60,9 +127,9 @@ def add_address_interactive():
     if label:
         labels[crypto_type][address] = label
     
-    save_addresses(addresses, labels)
+    append_log({'op': 'add', 'type': crypto_type, 'addr': address, 'label': label})
     
-    display_name = label if label else f"{address[:8]}...{address[-6:]}"
+    display_name = label if label else short_addr(address)
     print(f"✅ Added {crypto_type.upper()}: {display_name}")
 
 def list_addresses():
@@ -77,7 +144,7 @@ def list_addresses():
             print(f"\n{crypto_type.upper()} ({len(addresses[crypto_type])} addresses):")
             for i, addr in enumerate(addresses[crypto_type], 1):
                 label = labels[crypto_type].get(addr, '')
-                display = f"{addr[:8]}...{addr[-6:]}"
+                display = short_addr(addr)
                 if label:
                     display += f" ({label})"
                 print(f"  {i:2d}. {display}")
@@ -101,7 +168,7 @@ def remove_address_interactive():
     print(f"\n{crypto_type.upper()} Addresses:")
     for i, addr in enumerate(addresses[crypto_type], 1):
         label = labels[crypto_type].get(addr, '')
-        display = f"{addr[:8]}...{addr[-6:]}"
+        display = short_addr(addr)
         if label:
             display += f" ({label})"
         print(f"  {i}. {display}")
@@ -113,7 +180,7 @@ def remove_address_interactive():
             label = labels[crypto_type].get(addr_to_remove, '')
             
             # Confirm removal
-            display_name = label if label else f"{addr_to_remove[:8]}...{addr_to_remove[-6:]}"
+            display_name = label if label else short_addr(addr_to_remove)
             confirm = input(f"Remove {display_name}? (y/N): ").lower()
             
             if confirm == 'y':
@@ -121,7 +188,7 @@ def remove_address_interactive():
                 if addr_to_remove in labels[crypto_type]:
                     del labels[crypto_type][addr_to_remove]
                 
-                save_addresses(addresses, labels)
+                append_log({'op': 'remove', 'type': crypto_type, 'addr': addr_to_remove})
                 print(f"✅ Removed {display_name}")
             else:
                 print("❌ Cancelled")
@@ -232,6 +299,7 @@ def main():
         elif choice == '5':
             generate_env()
         elif choice == '6':
+            compact()
             print("👋 Goodbye!")
             break
         else:
@@ -6,26 +6,51 @@ import requests
 import time
 import os
 import sys
+from functools import lru_cache
 
+# Precompiled, anchored patterns — one C-level match per address instead
+# of chained startswith/length branches, and they catch characters that
+# are not in the Base58/Bech32 alphabets (the old length checks didn't)
+_BTC_P2PKH = re.compile(r'^1[a-km-zA-HJ-NP-Z1-9]{25,34}$')
+_BTC_P2SH = re.compile(r'^3[a-km-zA-HJ-NP-Z1-9]{25,34}$')
+_BTC_BECH32 = re.compile(r'^bc1[ac-hj-np-z02-9]{39,59}$')
+_ETH_HEX = re.compile(r'^[0-9a-fA-F]{40}$')
+
+# Multiline twins used to validate a whole batch in one C-level scan
+_BTC_ANY = re.compile(
+    r'^(?:1[a-km-zA-HJ-NP-Z1-9]{25,34}'
+    r'|3[a-km-zA-HJ-NP-Z1-9]{25,34}'
+    r'|bc1[ac-hj-np-z02-9]{39,59})$', re.MULTILINE)
+_ETH_ANY = re.compile(r'^0x[0-9a-fA-F]{40}$', re.MULTILINE)
+
+# Tokenizer for comma-separated env lists: one findall replaces
+# split(',') plus a stripping list comprehension
+_ENV_TOKEN = re.compile(r'[^,\s]+')
+
+def batch_validate(addresses, pattern):
+    """Return the set of valid addresses from one joined-buffer scan"""
+    return {m.group() for m in pattern.finditer('\n'.join(addresses))}
+
+@lru_cache(maxsize=4096)
 def validate_btc_address(address):
-    """Validate BTC address format"""
+    """Validate BTC address format (memoized — pure function of the address)"""
     if not address:
         return False, "Empty address"
     
     # Legacy P2PKH (starts with 1)
     if address.startswith('1'):
-        if len(address) < 26 or len(address) > 35:
-            return False, "Invalid P2PKH length"
+        if not _BTC_P2PKH.match(address):
+            return False, "Invalid P2PKH address"
     
     # Script P2SH (starts with 3)
     elif address.startswith('3'):
-        if len(address) < 26 or len(address) > 35:
-            return False, "Invalid P2SH length"
+        if not _BTC_P2SH.match(address):
+            return False, "Invalid P2SH address"
     
     # Bech32 Segwit (starts with bc1)
     elif address.startswith('bc1'):
-        if len(address) < 42 or len(address) > 62:
-            return False, "Invalid Bech32 length"
+        if not _BTC_BECH32.match(address):
+            return False, "Invalid Bech32 address"
     
     # Testnet addresses
     elif address.startswith(('m', 'n', '2', 'tb1')):
@@ -36,8 +61,9 @@ def validate_btc_address(address):
     
     return True, "Valid format"
 
+@lru_cache(maxsize=4096)
 def validate_eth_address(address):
-    """Validate ETH address format"""
+    """Validate ETH address format (memoized — pure function of the address)"""
     if not address:
         return False, "Empty address"
     
@@ -48,21 +74,45 @@ def validate_eth_address(address):
         return False, "Must be 42 characters long"
     
     # Check hex format
-    try:
-        int(address[2:], 16)
-    except ValueError:
+    if not _ETH_HEX.match(address[2:]):
         return False, "Contains invalid hex characters"
     
     return True, "Valid format"
 
+def _validate_section(symbol, name, addresses, pattern, validator):
+    """Validate one chain's addresses; both sections share this loop"""
+    print(f"\n{symbol} Validating {len(addresses)} {name} addresses...")
+    
+    # One regex pass marks the valid addresses; only failures take the
+    # per-address path (for their specific error message)
+    valid_set = batch_validate(addresses, pattern)
+    
+    # Buffer the per-address lines and write once at section end
+    lines = []
+    valid_count = 0
+    for addr in addresses:
+        if addr in valid_set:
+            is_valid, message = True, "Valid format"
+        else:
+            is_valid, message = validator(addr)
+        status = "✅" if is_valid else "❌"
+        # Plain concat skips the f-string format machinery per address
+        short_addr = addr[:10] + '...' + addr[-8:]
+        lines.append(f"  {status} {short_addr}: {message}")
+        
+        if is_valid:
+            valid_count += 1
+    
+    lines.append(f"✅ Valid: {valid_count}/{len(addresses)}")
+    sys.stdout.write('\n'.join(lines) + '\n')
+    
+    return valid_count == len(addresses)
+
 def validate_from_env():
     """Validate addresses from environment variables"""
     
-    btc_addresses = os.getenv('BTC_ADDRESSES', '').split(',')
-    btc_addresses = [addr.strip() for addr in btc_addresses if addr.strip()]
-    
-    eth_addresses = os.getenv('ETH_ADDRESSES', '').split(',')
-    eth_addresses = [addr.strip() for addr in eth_addresses if addr.strip()]
+    btc_addresses = _ENV_TOKEN.findall(os.getenv('BTC_ADDRESSES', ''))
+    eth_addresses = _ENV_TOKEN.findall(os.getenv('ETH_ADDRESSES', ''))
     
     print("🔍 Validating Addresses from Environment")
     print("=" * 50)
@@ -71,39 +121,13 @@ def validate_from_env():
     
     # Validate BTC addresses
     if btc_addresses:
-        print(f"\n₿ Validating {len(btc_addresses)} BTC addresses...")
-        
-        valid_count = 0
-        for addr in btc_addresses:
-            is_valid, message = validate_btc_address(addr)
-            status = "✅" if is_valid else "❌"
-            short_addr = f"{addr[:10]}...{addr[-8:]}"
-            print(f"  {status} {short_addr}: {message}")
-            
-            if is_valid:
-                valid_count += 1
-            else:
-                all_valid = False
-        
-        print(f"✅ Valid: {valid_count}/{len(btc_addresses)}")
+        if not _validate_section('₿', 'BTC', btc_addresses, _BTC_ANY, validate_btc_address):
+            all_valid = False
     
     # Validate ETH addresses
     if eth_addresses:
-        print(f"\n⟠ Validating {len(eth_addresses)} ETH addresses...")
-        
-        valid_count = 0
-        for addr in eth_addresses:
-            is_valid, message = validate_eth_address(addr)
-            status = "✅" if is_valid else "❌"
-            short_addr = f"{addr[:10]}...{addr[-8:]}"
-            print(f"  {status} {short_addr}: {message}")
-            
-            if is_valid:
-                valid_count += 1
-            else:
-                all_valid = False
-        
-        print(f"✅ Valid: {valid_count}/{len(eth_addresses)}")
+        if not _validate_section('⟠', 'ETH', eth_addresses, _ETH_ANY, validate_eth_address):
+            all_valid = False
     
     # Validate filtering settings
     min_usd = os.getenv('MINIMUM_USD_VALUE', '2.0')